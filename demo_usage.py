@@ -4,138 +4,174 @@ Example usage of the prompts.py module
 This script demonstrates how to use the various prompt generation functions.
 """
 
+import argparse
+import sys
+from types import MappingProxyType
+
 import prompts
 
 
+_BAR = "=" * 60
+_BANNER = f"{_BAR}\n{{title}}\n{_BAR}\n"
+_PREVIEW_CHARS = 200
+
+# (section name, marker text) pairs checked by demo_prompt_structure
+_SECTIONS = (
+    ("Environment Capabilities", "Python REPL"),
+    ("Core Principles (6 principles)", "Execute, Don't Describe"),
+    ("Context Processing Strategies (5 strategies)", "Strategy 1:"),
+    ("Task Patterns (6 patterns)", "Pattern A:"),
+    ("Special Case Handling", "When context variable exists"),
+    ("Output Format", "FINAL("),
+    ("Critical Rules", "Critical Rules"),
+    ("Code Examples", "chunk_size = len(context)"),
+)
+
+# (label, recommended strategy, get_system_prompt_with_context kwargs)
+# for demo_context_aware_prompts; the kwargs are read-only and shared
+_CTX_CASES = (
+    ("Small context (100K chars)", "Strategy 1 (Direct processing)", MappingProxyType({
+        'context_type': 'text',
+        'context_length': 100000,
+        'context_structure': 'Research paper',
+        'context_preview': 'Abstract: This paper presents...',
+    })),
+    ("Medium context (1.5M chars)", "Strategy 2 (Chunk and aggregate)", MappingProxyType({
+        'context_type': 'markdown',
+        'context_length': 1500000,
+        'context_structure': 'Technical documentation with sections',
+    })),
+    ("Large context (5M chars)", "Strategy 3 (Targeted search)", MappingProxyType({
+        'context_type': 'code',
+        'context_length': 5000000,
+        'context_structure': 'Complete code repository',
+    })),
+)
+
+
 def demo_basic_usage():
-    """Demonstrate basic prompt retrieval"""
-    print("=" * 60)
-    print("DEMO 1: Basic Prompt Retrieval")
-    print("=" * 60)
+    """Demonstrate basic prompt retrieval; returns the demo output"""
+    buf = []
+    buf.append(_BANNER.format(title="DEMO 1: Basic Prompt Retrieval"))
     
     prompt = prompts.get_system_prompt()
-    print(f"Prompt length: {len(prompt)} characters")
-    print(f"First 200 characters:\n{prompt[:200]}...")
-    print()
+    buf.append(
+        f"Prompt length: {len(prompt)} characters\n"
+        f"First {_PREVIEW_CHARS} characters:\n{prompt[:_PREVIEW_CHARS]}...\n"
+    )
+    buf.append("\n")
+    
+    return "".join(buf)
 
 
 def demo_context_aware_prompts():
-    """Demonstrate context-aware prompt generation"""
-    print("=" * 60)
-    print("DEMO 2: Context-Aware Prompts")
-    print("=" * 60)
+    """Demonstrate context-aware prompt generation; returns the demo output"""
+    buf = []
+    buf.append(_BANNER.format(title="DEMO 2: Context-Aware Prompts"))
     
-    # Small document
-    prompt_small = prompts.get_system_prompt_with_context(
-        context_type='text',
-        context_length=100000,
-        context_structure='Research paper',
-        context_preview='Abstract: This paper presents...'
-    )
-    print("Small context (100K chars):")
-    print("- Recommended: Strategy 1 (Direct processing)")
-    print(f"- Prompt length: {len(prompt_small)} characters\n")
-    
-    # Medium document
-    prompt_medium = prompts.get_system_prompt_with_context(
-        context_type='markdown',
-        context_length=1500000,
-        context_structure='Technical documentation with sections'
-    )
-    print("Medium context (1.5M chars):")
-    print("- Recommended: Strategy 2 (Chunk and aggregate)")
-    print(f"- Prompt length: {len(prompt_medium)} characters\n")
+    # Only the small context block differs between cases; the base prompt
+    # is shared.
+    for label, strategy, kwargs in _CTX_CASES:
+        prompt = prompts.get_system_prompt_with_context(**kwargs)
+        buf.append(
+            f"{label}:\n"
+            f"- Recommended: {strategy}\n"
+            f"- Prompt length: {len(prompt)} characters\n\n"
+        )
     
-    # Large document
-    prompt_large = prompts.get_system_prompt_with_context(
-        context_type='code',
-        context_length=5000000,
-        context_structure='Complete code repository'
-    )
-    print("Large context (5M chars):")
-    print("- Recommended: Strategy 3 (Targeted search)")
-    print(f"- Prompt length: {len(prompt_large)} characters\n")
+    return "".join(buf)
 
 
 def demo_specialized_prompts():
-    """Demonstrate specialized prompt generation"""
-    print("=" * 60)
-    print("DEMO 3: Specialized Prompts")
-    print("=" * 60)
+    """Demonstrate specialized prompt generation; returns the demo output"""
+    buf = []
+    buf.append(_BANNER.format(title="DEMO 3: Specialized Prompts"))
     
     # Research prompt
     research_prompt = prompts.get_system_prompt_for_research(
         topic="Artificial Intelligence in Healthcare",
         document_type="research paper"
     )
-    print(f"Research prompt for AI in Healthcare:")
-    print(f"- Length: {len(research_prompt)} characters")
-    print(f"- Includes: Pattern D (Research & Writing)\n")
+    buf.append(
+        f"Research prompt for AI in Healthcare:\n"
+        f"- Length: {len(research_prompt)} characters\n"
+        f"- Includes: Pattern D (Research & Writing)\n\n"
+    )
     
     # Code prompt
     code_prompt = prompts.get_system_prompt_for_code(
         task_description="Implement a REST API for user authentication"
     )
-    print(f"Code prompt for REST API implementation:")
-    print(f"- Length: {len(code_prompt)} characters")
-    print(f"- Includes: Pattern E (Code Analysis/Generation)\n")
+    buf.append(
+        f"Code prompt for REST API implementation:\n"
+        f"- Length: {len(code_prompt)} characters\n"
+        f"- Includes: Pattern E (Code Analysis/Generation)\n\n"
+    )
     
     # Analysis prompt
     analysis_prompt = prompts.get_system_prompt_for_analysis(
         context_description="Annual financial report with tables and charts"
     )
-    print(f"Analysis prompt for financial report:")
-    print(f"- Length: {len(analysis_prompt)} characters")
-    print(f"- Includes: Pattern B (Document/Context Analysis)\n")
+    buf.append(
+        f"Analysis prompt for financial report:\n"
+        f"- Length: {len(analysis_prompt)} characters\n"
+        f"- Includes: Pattern B (Document/Context Analysis)\n\n"
+    )
+    
+    return "".join(buf)
 
 
 def demo_prompt_structure():
-    """Show the structure of the main prompt"""
-    print("=" * 60)
-    print("DEMO 4: Prompt Structure Overview")
-    print("=" * 60)
+    """Show the structure of the main prompt; returns the demo output"""
+    buf = []
+    buf.append(_BANNER.format(title="DEMO 4: Prompt Structure Overview"))
     
-    prompt = prompts.MOSAIC_SYSTEM_PROMPT
+    prompt = prompts.get_system_prompt()
     
-    sections = [
-        ("Environment Capabilities", prompt.count("Python REPL") > 0),
-        ("Core Principles (6 principles)", prompt.count("Execute, Don't Describe") > 0),
-        ("Context Processing Strategies (5 strategies)", prompt.count("Strategy 1:") > 0),
-        ("Task Patterns (6 patterns)", prompt.count("Pattern A:") > 0),
-        ("Special Case Handling", prompt.count("When context variable exists") > 0),
-        ("Output Format", prompt.count("FINAL(") > 0),
-        ("Critical Rules", prompt.count("Critical Rules") > 0),
-        ("Code Examples", prompt.count("chunk_size = len(context)") > 0),
-    ]
+    buf.append("Main prompt includes:\n")
+    for section_name, needle in _SECTIONS:
+        status = "✓" if needle in prompt else "✗"
+        buf.append(f"  {status} {section_name}\n")
     
-    print("Main prompt includes:")
-    for section_name, has_section in sections:
-        status = "✓" if has_section else "✗"
-        print(f"  {status} {section_name}")
+    buf.append(f"\nTotal prompt length: {len(prompt):,} characters\n\n")
     
-    print(f"\nTotal prompt length: {len(prompt):,} characters")
-    print()
+    return "".join(buf)
+
 
+# Demos selectable from the command line, in run order
+_DEMOS = {
+    'basic': demo_basic_usage,
+    'context': demo_context_aware_prompts,
+    'specialized': demo_specialized_prompts,
+    'structure': demo_prompt_structure,
+}
 
-def main():
-    """Run all demos"""
-    print("\n")
-    print("=" * 60)
-    print("PROMPTS.PY USAGE DEMONSTRATIONS")
-    print("=" * 60)
-    print()
+
+def main(argv=None):
+    """Run the selected demos (all of them by default)"""
+    parser = argparse.ArgumentParser(description="Example usage of the prompts.py module")
+    parser.add_argument(
+        '--demos',
+        default=','.join(_DEMOS),
+        help=f"comma-separated demos to run (choices: {', '.join(_DEMOS)})",
+    )
+    args = parser.parse_args(argv)
     
-    demo_basic_usage()
-    demo_context_aware_prompts()
-    demo_specialized_prompts()
-    demo_prompt_structure()
+    names = [name.strip() for name in args.demos.split(',') if name.strip()]
+    unknown = [name for name in names if name not in _DEMOS]
+    if unknown:
+        parser.error(f"unknown demo(s): {', '.join(unknown)}")
     
-    print("=" * 60)
-    print("DEMO COMPLETE")
-    print("=" * 60)
-    print("\nFor more information, see the docstrings in prompts.py")
-    print("or run: python -c 'import prompts; help(prompts)'")
-    print()
+    sys.stdout.write("".join([
+        "\n\n",
+        _BANNER.format(title="PROMPTS.PY USAGE DEMONSTRATIONS"),
+        "\n",
+        *(_DEMOS[name]() for name in names),
+        _BANNER.format(title="DEMO COMPLETE"),
+        "\nFor more information, see the docstrings in prompts.py\n",
+        "or run: python -c 'import prompts; help(prompts)'\n",
+        "\n",
+    ]))
 
 
 if __name__ == '__main__':
@@ -14,6 +14,10 @@ Based on:
 - The Mosaic brain.py implementation
 """
 
+import functools
+import json
+import string
+
 MOSAIC_SYSTEM_PROMPT = """# Mosaic RLM System Prompt
 
 You are an advanced AI assistant with access to powerful tools and capabilities. Your goal is to execute tasks efficiently and accurately by leveraging these tools strategically.
@@ -116,10 +120,11 @@ Context:
 ```python
 # Chunk the context into manageable pieces
 chunk_size = len(context) // 10  # Aim for 10 chunks
-answers = []
 
 print(f"Processing {len(context)} chars in ~10 chunks of {chunk_size} chars each")
 
+# Build one prompt per chunk, then query all chunks in a single batch
+chunk_prompts = []
 for i in range(10):
     # Handle last chunk specially to get remainder
     if i < 9:
@@ -127,8 +132,7 @@ for i in range(10):
     else:
         chunk_str = context[i*chunk_size:]
     
-    # Query each chunk
-    answer = llm_query(f\"\"\"
+    chunk_prompts.append(f\"\"\"
 Query: {query}
 
 Chunk {i+1}/10:
@@ -136,7 +140,9 @@ Chunk {i+1}/10:
 
 Extract relevant information for the query. Be specific and cite details.
 \"\"\")
-    answers.append(answer)
+
+answers = llm_query_batched(chunk_prompts)
+for i, answer in enumerate(answers):
     print(f"Chunk {i+1}: {answer[:200]}...")
 
 # Aggregate all chunk answers
@@ -164,6 +170,10 @@ import re
 
 print(f"Large context detected: {len(context)} chars")
 
+# Check memory before scanning the context
+prior_knowledge = memory_search(query, k=5)
+print(f"Found {len(prior_knowledge)} relevant memory entries")
+
 # First, understand structure
 structure = llm_query(f\"\"\"
 Analyze this brief preview and describe the structure:
@@ -180,37 +190,69 @@ print(f"Structure: {structure}")
 search_queries = llm_query(f\"\"\"
 Query: {query}
 Document structure: {structure}
+Prior knowledge: {prior_knowledge}
 
-Generate 3-5 specific search terms or phrases that would help find relevant information.
+Generate 3-5 specific search terms or phrases that would help find information
+not already covered by prior knowledge.
 Return as comma-separated list.
 \"\"\")
 
-queries_list = [q.strip() for q in search_queries.split(',')]
+queries_list = [q.strip() for q in search_queries.split(',') if q.strip()]
 print(f"Search queries: {queries_list}")
 
-# Extract relevant sections
-relevant_sections = []
-for search_term in queries_list:
-    # Find occurrences
-    pattern = re.compile(re.escape(search_term), re.IGNORECASE)
-    matches = pattern.finditer(context)
+# Extract relevant sections in a single pass over the context for all terms
+# (deduplicated ignoring case, as the search does; longest terms first so
+# they win over terms they contain)
+terms = sorted({t.lower(): t for t in queries_list}.values(), key=len, reverse=True)
+spans = []
+if terms:
+    pattern = re.compile("|".join(re.escape(t) for t in terms), re.IGNORECASE)
+    term_by_text = {t.lower(): t for t in terms}
+    hits = {t: 0 for t in terms}
     
-    for match in list(matches)[:3]:  # Max 3 per term
+    for match in pattern.finditer(context):
+        search_term = term_by_text.get(match.group(0).lower())
+        if search_term is None or hits[search_term] >= 3:  # Max 3 per term
+            continue
+        hits[search_term] += 1
+        
         start = max(0, match.start() - 1000)
         end = min(len(context), match.end() + 1000)
-        section = context[start:end]
-        relevant_sections.append(section)
+        spans.append((start, end))
         print(f"Found match for '{search_term}' at position {match.start()}")
+        
+        # Stop early once every term has its matches; a term with fewer
+        # than 3 matches still needs the full scan
+        if all(n >= 3 for n in hits.values()):
+            break
+
+if not spans:
+    # No usable terms or matches: fall back to the previewed start and end
+    print("No matches found, using the context preview")
+    spans = [(0, 5000), (max(0, len(context) - 5000), len(context))]
+
+# Merge overlapping windows so no text is sent twice
+merged = []
+for start, end in sorted(spans):
+    if merged and start <= merged[-1][1]:
+        merged[-1][1] = max(merged[-1][1], end)
+    else:
+        merged.append([start, end])
+relevant_sections = [context[start:end] for start, end in merged]
+print(f"Merged {len(spans)} matches into {len(relevant_sections)} sections")
 
 # Process relevant sections only
-combined_sections = "\n\n---\n\n".join(relevant_sections)
+combined_sections = "\\n\\n---\\n\\n".join(relevant_sections)
 answer = llm_query(f\"\"\"
 Query: {query}
 
+Prior knowledge:
+{prior_knowledge}
+
 Relevant sections:
 {combined_sections}
 
-Answer the query based on these sections.
+Answer the query based on these sections and prior knowledge.
 \"\"\")
 
 print(f"Answer: {answer}")
@@ -227,7 +269,7 @@ import re
 # For markdown, split by headings
 if '# ' in context or '## ' in context:
     # Split by markdown headings
-    sections = re.split(r'\n(?=#{1,3} )', context)
+    sections = re.split(r'\\n(?=#{1,3} )', context)
     print(f"Found {len(sections)} markdown sections")
     
     # Process each section
@@ -250,11 +292,11 @@ Content:
         else:
             summary = section
         
-        section_summaries.append(f"## {heading}\n{summary}")
+        section_summaries.append(f"## {heading}\\n{summary}")
         print(f"Processed: {heading}")
     
     # Combine and answer
-    combined = "\n\n".join(section_summaries)
+    combined = "\\n\\n".join(section_summaries)
     answer = llm_query(f\"\"\"
 Query: {query}
 
@@ -357,7 +399,7 @@ Provide a direct answer based on known information.
 \"\"\")
 else:
     # Answer directly if no context needed
-    answer = llm_query(f"Question: {query}\n\nProvide a direct, concise answer.")
+    answer = llm_query(f"Question: {query}\\n\\nProvide a direct, concise answer.")
 
 FINAL(answer)
 ```
@@ -372,17 +414,9 @@ print(f"Context length: {context_len} characters")
 
 if context_len < 500000:
     # Strategy 1: Direct processing
-    answer = llm_query(f"Analyze: {query}\n\nDocument:\n{context}")
-elif context_len < 2000000:
-    # Strategy 2: Chunk and aggregate
-    # (See Strategy 2 code above)
-    pass
-else:
-    # Strategy 3: Targeted search
-    # (See Strategy 3 code above)
-    pass
-
-FINAL(answer)
+    answer = llm_query(f"Analyze: {query}\\n\\nDocument:\\n{context}")
+    FINAL(answer)
+# Otherwise apply Strategy 2 (< 2M chars) or Strategy 3 from above
 ```
 
 ### Pattern C: Multi-Step Tasks
@@ -402,7 +436,7 @@ for step_desc in steps:
     print(f"Executing: {step_desc}")
     
     # Build context from previous results
-    context_str = "\n".join([f"{k}: {v}" for k, v in results.items()])
+    context_str = "\\n".join([f"{k}: {v}" for k, v in results.items()])
     
     result = llm_query(f\"\"\"
 Task: {query}
@@ -463,18 +497,21 @@ Provide a comprehensive answer with specific details and examples.
     findings[rq] = answer
     print(f"Answer: {answer[:200]}...")
 
+# Format findings once and reuse the text in every prompt below
+findings_text = "\\n\\n".join(f"Q: {q}\\nA: {a}" for q, a in findings.items())
+
 # Create outline
 outline = llm_query(f\"\"\"
 Topic: {topic}
 
 Research findings:
-{chr(10).join([f"Q: {q}\nA: {a}\n" for q, a in findings.items()])}
+{findings_text}
 
 Create a detailed outline for a {document_type} on this topic.
 Include main sections and key points for each.
 \"\"\")
 
-print(f"Outline created:\n{outline}")
+print(f"Outline created:\\n{outline}")
 
 # Write sections
 document_sections = {}
@@ -491,7 +528,7 @@ Outline:
 {outline}
 
 Research findings:
-{findings}
+{findings_text}
 
 Previously written sections:
 {document_sections}
@@ -504,7 +541,7 @@ examples, and maintain coherence with other sections.
     print(f"Section written: {len(section_content)} chars")
 
 # Combine into final document
-final_document = "\n\n".join([f"# {name}\n\n{content}" 
+final_document = "\\n\\n".join([f"# {name}\\n\\n{content}" 
                                for name, content in document_sections.items()])
 
 print(f"Document complete: {len(final_document)} chars")
@@ -552,9 +589,9 @@ Provide detailed analysis of {aspect}.
         print(f"{aspect}: {analysis[:150]}...")
     
     # Compile report
-    report = f"# Code Analysis\n\n## Overview\n{overview}\n\n"
+    report = f"# Code Analysis\\n\\n## Overview\\n{overview}\\n\\n"
     for aspect, analysis in detailed_analysis.items():
-        report += f"## {aspect}\n{analysis}\n\n"
+        report += f"## {aspect}\\n{analysis}\\n\\n"
     
     FINAL(report)
 
@@ -645,16 +682,7 @@ if 'context' in locals() and context:
     context_len = len(context)
     print(f"Context detected: {context_len} chars")
     
-    # Apply appropriate strategy based on size
-    if context_len < 500000:
-        # Use Strategy 1
-        pass
-    elif context_len < 2000000:
-        # Use Strategy 2
-        pass
-    else:
-        # Use Strategy 3
-        pass
+    # Apply Strategy 1 (< 500K chars), 2 (< 2M chars) or 3 from above
 else:
     print("No context provided")
     # Check memory or answer directly
@@ -769,6 +797,8 @@ FINAL_VAR(result_data)
 Here's a complete example showing best practices:
 
 ```python
+import re
+
 # 1. Understand the task
 query = "Analyze the provided research paper and identify key contributions"
 print(f"Task: {query}")
@@ -810,9 +840,15 @@ else:
     findings = {}
     
     for section in sections:
-        # Find section in context
-        section_pattern = f"#{1,3} {section}"
-        # ... extract section ...
+        # Find the section heading, then read up to the next heading
+        heading = re.search(rf"^#{{1,3}}\\s+{re.escape(section)}\\s*$", context, re.MULTILINE)
+        if not heading:
+            print(f"{section}: not found")
+            continue
+        
+        next_heading = re.search(r"^#{1,3}\\s", context[heading.end():], re.MULTILINE)
+        section_end = heading.end() + next_heading.start() if next_heading else len(context)
+        section_text = context[heading.end():section_end].strip()
         
         if section_text:
             analysis = llm_query(f"Analyze the {section} section: {section_text[:5000]}")
@@ -844,12 +880,207 @@ def get_system_prompt():
     return MOSAIC_SYSTEM_PROMPT
 
 
-def get_system_prompt_with_context(context_type=None, context_length=None, 
-                                   context_structure=None, context_preview=None):
+@functools.lru_cache(maxsize=None)
+def get_system_prompt_bytes():
     """
-    Returns the system prompt with context information injected.
+    Returns the main system prompt encoded as UTF-8.
     
-    This helps the LLM choose the appropriate strategy automatically.
+    Prefer this over encoding get_system_prompt() per request when writing
+    the prompt to an HTTP body, socket, or tokenizer that takes bytes; the
+    encoding is done once and cached.
+    
+    Returns:
+        bytes: UTF-8 encoded system prompt
+    """
+    return MOSAIC_SYSTEM_PROMPT.encode('utf-8')
+
+
+@functools.lru_cache(maxsize=None)
+def get_system_prompt_json():
+    """
+    Returns the main system prompt as a JSON string literal (quoted and escaped).
+    
+    Lets callers splice the prompt into a hand-built JSON request body, e.g.
+    '{"system": ' + get_system_prompt_json() + ', ...}', without re-escaping
+    the whole prompt through json.dumps() on every request.
+    
+    Returns:
+        str: JSON-encoded system prompt, including the surrounding quotes
+    """
+    return json.dumps(MOSAIC_SYSTEM_PROMPT)
+
+
+# Rough characters-per-token ratio for English text, used when tiktoken is
+# not installed
+_CHARS_PER_TOKEN = 4
+
+
+@functools.lru_cache(maxsize=None)
+def _get_encoding(encoding_name="cl100k_base"):
+    """
+    Returns the tiktoken encoding, or None if it is unavailable.
+    
+    The encoding is loaded on first use rather than at import, since
+    tiktoken may need to fetch its BPE files. If tiktoken is not installed
+    or the files cannot be loaded (e.g. on an offline host), callers fall
+    back to the ~4 characters per token estimate.
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.get_encoding(encoding_name)
+    except Exception:
+        return None
+
+
+@functools.lru_cache(maxsize=None)
+def get_base_prompt_token_count():
+    """
+    Returns the number of tokens in the main system prompt.
+    
+    The count is computed once and cached. It is exact (cl100k_base) when
+    tiktoken is installed, otherwise it is estimated at ~4 characters per
+    token.
+    
+    Returns:
+        int: Token count of MOSAIC_SYSTEM_PROMPT
+    """
+    encoding = _get_encoding()
+    if encoding is None:
+        return -(-len(MOSAIC_SYSTEM_PROMPT) // _CHARS_PER_TOKEN)
+    return len(encoding.encode(MOSAIC_SYSTEM_PROMPT))
+
+
+def remaining_context_budget(model_limit):
+    """
+    Returns how many tokens remain for context after the main system prompt.
+    
+    Args:
+        model_limit (int): Model context window size in tokens
+    
+    Returns:
+        int: Tokens left for context and conversation (never negative)
+    """
+    return max(0, model_limit - get_base_prompt_token_count())
+
+
+def _windows(total, size, step):
+    """Yields (start, end) windows of `size` items advancing by `step`, covering `total` items."""
+    start = 0
+    while start < total:
+        yield start, min(start + size, total)
+        if start + size >= total:
+            break
+        start += step
+
+
+def _token_chunks(encoding, text, target_tokens, step):
+    """Yields token windows of text, with each cut moved to a UTF-8 character boundary."""
+    # Special-token text such as "<|endoftext|>" is ordinary context here
+    token_ids = encoding.encode(text, disallowed_special=())
+    data = text.encode('utf-8')
+    # Byte offset of each token in data, plus the end of data
+    offsets = [0]
+    for token_bytes in encoding.decode_tokens_bytes(token_ids):
+        offsets.append(offsets[-1] + len(token_bytes))
+    
+    def snap(i):
+        # A token may end partway through a multi-byte character; step the
+        # cut back until it no longer lands on a UTF-8 continuation byte
+        while offsets[i] < len(data) and data[offsets[i]] & 0xC0 == 0x80:
+            i -= 1
+        return offsets[i]
+    
+    for start, end in _windows(len(token_ids), target_tokens, step):
+        start, end = snap(start), snap(end)
+        # Windows narrower than one character are empty once snapped; the
+        # next window picks the character up
+        if start < end:
+            yield data[start:end].decode('utf-8')
+
+
+def _char_chunks(text, target_tokens, step):
+    """Yields character windows of text, at ~4 characters per token."""
+    size, step = target_tokens * _CHARS_PER_TOKEN, step * _CHARS_PER_TOKEN
+    for start, end in _windows(len(text), size, step):
+        yield text[start:end]
+
+
+def chunk_by_tokens(text, target_tokens, overlap_tokens=200):
+    """
+    Splits text into chunks of about target_tokens tokens each.
+    
+    Chunking by tokens rather than characters lets each chunk fill a model's
+    window, so long contexts need fewer sub-LLM calls. Consecutive chunks
+    share overlap_tokens tokens so content cut at a boundary appears whole
+    in one of them. Uses tiktoken (cl100k_base) when available, otherwise
+    ~4 characters per token. Chunks never split a character, so a chunk
+    may be a token or two shorter than target_tokens.
+    
+    Args:
+        text (str): Text to split
+        target_tokens (int): Maximum tokens per chunk
+        overlap_tokens (int): Tokens shared by consecutive chunks (default: 200)
+    
+    Returns:
+        iterator: Successive chunks of text (str)
+    
+    Raises:
+        ValueError: If overlap_tokens is negative or not smaller than target_tokens
+    """
+    if not 0 <= overlap_tokens < target_tokens:
+        raise ValueError("overlap_tokens must be >= 0 and smaller than target_tokens")
+    
+    step = target_tokens - overlap_tokens
+    encoding = _get_encoding()
+    if encoding is None:
+        return _char_chunks(text, target_tokens, step)
+    return _token_chunks(encoding, text, target_tokens, step)
+
+
+# Short names for the size-based strategies, keyed by strategy number
+_SIZE_STRATEGY_NAMES = {
+    1: "Direct processing",
+    2: "Chunk and aggregate",
+    3: "Targeted search",
+}
+
+# Context types that get a Strategy 4 (structure-aware) recommendation
+_STRUCTURED_CONTEXT_TYPES = frozenset({'markdown', 'json', 'xml', 'html', 'code'})
+
+
+def select_strategy(context_length):
+    """
+    Selects the size-based context processing strategy for a context.
+    
+    Uses the same thresholds as the strategies in the main prompt:
+    Strategy 1 below 500K characters, Strategy 2 below 2M characters,
+    and Strategy 3 otherwise.
+    
+    Args:
+        context_length (int): Length of context in characters
+    
+    Returns:
+        int: Strategy number (1, 2, or 3)
+    """
+    if context_length < 500000:
+        return 1
+    if context_length < 2000000:
+        return 2
+    return 3
+
+
+def render_context_block(context_type=None, context_length=None,
+                         context_structure=None, context_preview=None):
+    """
+    Renders the "Current Task Context" block describing the caller's context.
+    
+    The block is the only part of a context-aware prompt that varies per
+    request. Sending it as a separate message keeps the system prompt
+    byte-identical across requests, which is what provider-side prompt
+    caches key on.
     
     Args:
         context_type (str, optional): Type of context ('text', 'code', 'markdown', 'json', etc.)
@@ -858,57 +1089,93 @@ def get_system_prompt_with_context(context_type=None, context_length=None,
         context_preview (str, optional): Brief preview of context (first/last portions)
     
     Returns:
-        str: System prompt with context info
+        str: Markdown block describing the current context
     """
-    context_info = "\n\n## Current Task Context\n\n"
+    parts = ["## Current Task Context\n\n"]
     
     if context_length is not None:
-        context_info += f"- **Context Length**: {context_length:,} characters\n"
+        parts.append(f"- **Context Length**: {context_length:,} characters\n")
         
         # Add strategy recommendation
-        if context_length < 500000:
-            context_info += "  - *Recommended Strategy*: Strategy 1 (Direct processing)\n"
-        elif context_length < 2000000:
-            context_info += "  - *Recommended Strategy*: Strategy 2 (Chunk and aggregate)\n"
-        else:
-            context_info += "  - *Recommended Strategy*: Strategy 3 (Targeted search)\n"
+        strategy = select_strategy(context_length)
+        parts.append(
+            f"  - *Recommended Strategy*: Strategy {strategy} "
+            f"({_SIZE_STRATEGY_NAMES[strategy]})\n"
+        )
     
     if context_type is not None:
-        context_info += f"- **Context Type**: {context_type}\n"
+        parts.append(f"- **Context Type**: {context_type}\n")
         
-        if context_type.lower() in ['markdown', 'json', 'xml', 'html', 'code']:
-            context_info += "  - *Recommended Strategy*: Strategy 4 (Structure-aware chunking)\n"
+        if context_type.lower() in _STRUCTURED_CONTEXT_TYPES:
+            parts.append("  - *Recommended Strategy*: Strategy 4 (Structure-aware chunking)\n")
     
     if context_structure is not None:
-        context_info += f"- **Structure**: {context_structure}\n"
+        parts.append(f"- **Structure**: {context_structure}\n")
     
     if context_preview is not None:
-        context_info += f"\n### Context Preview\n\n```\n{context_preview[:500]}\n...\n```\n"
+        parts.append(f"\n### Context Preview\n\n```\n{context_preview[:500]}\n...\n```\n")
     
-    return MOSAIC_SYSTEM_PROMPT + context_info
+    return "".join(parts)
 
 
-def get_system_prompt_for_research(topic, document_type="research paper"):
+def get_system_prompt_with_context(context_type=None, context_length=None, 
+                                   context_structure=None, context_preview=None):
     """
-    Returns the system prompt optimized for research and writing tasks.
+    Returns the system prompt with context information injected.
+    
+    This helps the LLM choose the appropriate strategy automatically.
     
     Args:
-        topic (str): The research topic
-        document_type (str): Type of document to create (default: "research paper")
+        context_type (str, optional): Type of context ('text', 'code', 'markdown', 'json', etc.)
+        context_length (int, optional): Length of context in characters
+        context_structure (str, optional): Description of context structure
+        context_preview (str, optional): Brief preview of context (first/last portions)
     
     Returns:
-        str: System prompt optimized for research/writing
+        str: System prompt with context info
     """
-    research_addendum = f"""
+    context_info = render_context_block(
+        context_type, context_length, context_structure, context_preview
+    )
+    return MOSAIC_SYSTEM_PROMPT + "\n\n" + context_info
+
+
+def get_system_prompt_parts(context_type=None, context_length=None,
+                            context_structure=None, context_preview=None):
+    """
+    Returns the static system prompt and the per-request context block separately.
+    
+    Pass the first element as the system prompt and send the second as a
+    user message ahead of the task. The system prompt is then identical on
+    every request and stays eligible for provider-side prompt caching, unlike
+    get_system_prompt_with_context() which folds the context into it.
+    
+    Args:
+        context_type (str, optional): Type of context ('text', 'code', 'markdown', 'json', etc.)
+        context_length (int, optional): Length of context in characters
+        context_structure (str, optional): Description of context structure
+        context_preview (str, optional): Brief preview of context (first/last portions)
+    
+    Returns:
+        tuple: (system_prompt, context_block) strings
+    """
+    context_info = render_context_block(
+        context_type, context_length, context_structure, context_preview
+    )
+    return MOSAIC_SYSTEM_PROMPT, context_info
+
+
+# Addendum for the research variant of build_prompt()
+_RESEARCH_ADDENDUM = string.Template("""
 
 ## Current Research Task
 
-You are tasked with researching and writing a {document_type} on the topic: **{topic}**
+You are tasked with researching and writing a ${document_type} on the topic: **${topic}**
 
 ### Recommended Approach
 
 1. **Research Phase** (Pattern D):
-   - Check memory_search("{topic}", k=10) for prior knowledge
+   - Check memory_search("${topic}", k=10) for prior knowledge
    - Define 4-6 key research questions
    - Use llm_query() to investigate each question
    - Gather and organize findings
@@ -931,29 +1198,18 @@ You are tasked with researching and writing a {document_type} on the topic: **{t
 
 ### Expected Output
 
-Return the complete {document_type} using FINAL() with proper formatting, citations, and structure.
+Return the complete ${document_type} using FINAL() with proper formatting, citations, and structure.
 
 **Now proceed with the research and writing task using Pattern D from the main prompt.**
-"""
-    
-    return MOSAIC_SYSTEM_PROMPT + research_addendum
+""")
 
 
-def get_system_prompt_for_code(task_description):
-    """
-    Returns the system prompt optimized for code analysis or generation tasks.
-    
-    Args:
-        task_description (str): Description of the code task
-    
-    Returns:
-        str: System prompt optimized for code tasks
-    """
-    code_addendum = f"""
+# Addendum for the code variant of build_prompt()
+_CODE_ADDENDUM = string.Template("""
 
 ## Current Code Task
 
-You are tasked with: **{task_description}**
+You are tasked with: **${task_description}**
 
 ### Recommended Approach
 
@@ -982,26 +1238,15 @@ Ensure all code:
 - Is tested with examples
 
 **Now proceed with the code task using Pattern E from the main prompt.**
-"""
-    
-    return MOSAIC_SYSTEM_PROMPT + code_addendum
+""")
 
 
-def get_system_prompt_for_analysis(context_description):
-    """
-    Returns the system prompt optimized for document/context analysis tasks.
-    
-    Args:
-        context_description (str): Description of what context will be provided
-    
-    Returns:
-        str: System prompt optimized for analysis tasks
-    """
-    analysis_addendum = f"""
+# Addendum for the analysis variant of build_prompt()
+_ANALYSIS_ADDENDUM = string.Template("""
 
 ## Current Analysis Task
 
-You will analyze: **{context_description}**
+You will analyze: **${context_description}**
 
 ### Recommended Approach
 
@@ -1033,18 +1278,158 @@ You will analyze: **{context_description}**
 - **Structured content**: Leverage structure for efficient processing
 
 **Now proceed with the analysis task using appropriate strategies from the main prompt.**
-"""
+""")
+
+
+# Specialized prompt addenda, keyed by variant name
+_VARIANT_ADDENDA = {
+    'research': _RESEARCH_ADDENDUM,
+    'code': _CODE_ADDENDUM,
+    'analysis': _ANALYSIS_ADDENDUM,
+}
+
+
+# Placeholder defaults, keyed by variant name
+_VARIANT_DEFAULTS = {
+    'research': {'document_type': "research paper"},
+}
+
+
+def _render_addendum(variant, values):
+    """Fills in the addendum for a prompt variant, rejecting unknown variants and missing values."""
+    try:
+        addendum = _VARIANT_ADDENDA[variant]
+    except KeyError:
+        raise ValueError(f"Unknown prompt variant: {variant!r}") from None
+    values = {**_VARIANT_DEFAULTS.get(variant, {}), **values}
+    try:
+        return addendum.substitute(values)
+    except KeyError as exc:
+        raise TypeError(f"Prompt variant {variant!r} is missing a value for {exc.args[0]!r}") from None
+
+
+@functools.lru_cache(maxsize=128)
+def _build_prompt(variant, items):
+    """Cached body of build_prompt(); items is a sorted tuple of (name, text) pairs."""
+    return MOSAIC_SYSTEM_PROMPT + _render_addendum(variant, dict(items))
+
+
+def build_prompt(variant, **kwargs):
+    """
+    Returns the system prompt followed by the addendum for a specialized task.
+    
+    The get_system_prompt_for_* functions are thin wrappers around this;
+    adding a variant only needs a new entry in _VARIANT_ADDENDA.
+    
+    Args:
+        variant (str): Addendum to append ('research', 'code', or 'analysis')
+        **kwargs: Values for the addendum's placeholders; the research
+            variant's document_type defaults to "research paper"
+    
+    Returns:
+        str: System prompt with the variant's addendum
+    
+    Raises:
+        ValueError: If variant is unknown
+        TypeError: If a placeholder has no value
+    """
+    # Values are only rendered as text, so cache on their text; this also
+    # accepts values that are not hashable
+    items = tuple(sorted((name, str(value)) for name, value in kwargs.items()))
+    return _build_prompt(variant, items)
+
+
+def get_cacheable_blocks(variant=None, **kwargs):
+    """
+    Returns the system prompt as content blocks with a cache breakpoint.
+    
+    The main prompt is the first block and carries
+    cache_control={"type": "ephemeral"}, so providers that support prompt
+    caching (e.g. the Anthropic Messages API) can cache it across requests.
+    A variant's addendum, if any, follows as a separate uncached block.
+    
+    Args:
+        variant (str, optional): Addendum to append ('research', 'code', or 'analysis')
+        **kwargs: Values for the addendum's placeholders
+    
+    Returns:
+        list: Text content blocks for the request's system parameter
+    
+    Raises:
+        TypeError: If placeholder values are given without a variant
+    """
+    if variant is None and kwargs:
+        raise TypeError(
+            f"Placeholder values given without a variant: {', '.join(sorted(kwargs))}"
+        )
+    
+    blocks = [{
+        "type": "text",
+        "text": MOSAIC_SYSTEM_PROMPT,
+        "cache_control": {"type": "ephemeral"},
+    }]
+    if variant is not None:
+        blocks.append({"type": "text", "text": _render_addendum(variant, kwargs).lstrip("\n")})
+    return blocks
+
+
+def get_system_prompt_for_research(topic, document_type="research paper"):
+    """
+    Returns the system prompt optimized for research and writing tasks.
+    
+    Args:
+        topic (str): The research topic
+        document_type (str): Type of document to create (default: "research paper")
     
-    return MOSAIC_SYSTEM_PROMPT + analysis_addendum
+    Returns:
+        str: System prompt optimized for research/writing
+    """
+    return build_prompt('research', topic=topic, document_type=document_type)
+
+
+def get_system_prompt_for_code(task_description):
+    """
+    Returns the system prompt optimized for code analysis or generation tasks.
+    
+    Args:
+        task_description (str): Description of the code task
+    
+    Returns:
+        str: System prompt optimized for code tasks
+    """
+    return build_prompt('code', task_description=task_description)
+
+
+def get_system_prompt_for_analysis(context_description):
+    """
+    Returns the system prompt optimized for document/context analysis tasks.
+    
+    Args:
+        context_description (str): Description of what context will be provided
+    
+    Returns:
+        str: System prompt optimized for analysis tasks
+    """
+    return build_prompt('analysis', context_description=context_description)
 
 
 # Module metadata
 __version__ = "1.0.0"
-__all__ = [
+__all__ = (
     'MOSAIC_SYSTEM_PROMPT',
+    'build_prompt',
+    'chunk_by_tokens',
+    'get_base_prompt_token_count',
+    'get_cacheable_blocks',
     'get_system_prompt',
-    'get_system_prompt_with_context',
-    'get_system_prompt_for_research',
-    'get_system_prompt_for_code',
+    'get_system_prompt_bytes',
     'get_system_prompt_for_analysis',
-]
+    'get_system_prompt_for_code',
+    'get_system_prompt_for_research',
+    'get_system_prompt_json',
+    'get_system_prompt_parts',
+    'get_system_prompt_with_context',
+    'remaining_context_budget',
+    'render_context_block',
+    'select_strategy',
+)
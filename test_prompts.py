@@ -2,9 +2,21 @@
 Tests for prompts.py module
 """
 
+import json
+import logging
+import re
+import sys
+import types
+
 import prompts
 
 
+log = logging.getLogger(__name__)
+
+# Shared by the content checks below
+_PROMPT = prompts.MOSAIC_SYSTEM_PROMPT
+
+
 def test_get_system_prompt():
     """Test that get_system_prompt returns a non-empty string"""
     prompt = prompts.get_system_prompt()
@@ -14,7 +26,20 @@ def test_get_system_prompt():
     assert "Environment Capabilities" in prompt
     assert "Core Principles" in prompt
     assert "Context Processing Strategies" in prompt
-    print("✓ get_system_prompt() works correctly")
+    log.info("✓ get_system_prompt() works correctly")
+
+
+def test_get_system_prompt_encoded_forms():
+    """Test the cached UTF-8 and JSON encodings of the system prompt"""
+    encoded = prompts.get_system_prompt_bytes()
+    assert isinstance(encoded, bytes)
+    assert encoded.decode('utf-8') == prompts.MOSAIC_SYSTEM_PROMPT
+    assert prompts.get_system_prompt_bytes() is encoded
+    
+    body = '{"system": ' + prompts.get_system_prompt_json() + '}'
+    assert json.loads(body)["system"] == prompts.MOSAIC_SYSTEM_PROMPT
+    assert prompts.get_system_prompt_json() is prompts.get_system_prompt_json()
+    log.info("✓ Encoded system prompt forms are cached and round-trip")
 
 
 def test_get_system_prompt_with_context():
@@ -27,21 +52,21 @@ def test_get_system_prompt_with_context():
     )
     assert "Strategy 1 (Direct processing)" in prompt_small
     assert "100,000 characters" in prompt_small
-    print("✓ Small context prompt works")
+    log.info("✓ Small context prompt works")
     
     # Test with medium context
     prompt_medium = prompts.get_system_prompt_with_context(
         context_length=1000000
     )
     assert "Strategy 2 (Chunk and aggregate)" in prompt_medium
-    print("✓ Medium context prompt works")
+    log.info("✓ Medium context prompt works")
     
     # Test with large context
     prompt_large = prompts.get_system_prompt_with_context(
         context_length=5000000
     )
     assert "Strategy 3 (Targeted search)" in prompt_large
-    print("✓ Large context prompt works")
+    log.info("✓ Large context prompt works")
     
     # Test with structured content
     prompt_structured = prompts.get_system_prompt_with_context(
@@ -49,7 +74,34 @@ def test_get_system_prompt_with_context():
         context_length=200000
     )
     assert "Strategy 4 (Structure-aware chunking)" in prompt_structured
-    print("✓ Structured content prompt works")
+    log.info("✓ Structured content prompt works")
+    
+    # Arguments are only formatted, so they need not be hashable
+    prompt_listed = prompts.get_system_prompt_with_context(context_structure=['a', 'b'])
+    assert "['a', 'b']" in prompt_listed
+
+
+def test_get_system_prompt_parts():
+    """Test that the context block is kept out of the static system prompt"""
+    system, context_block = prompts.get_system_prompt_parts(
+        context_type='markdown',
+        context_length=750000,
+        context_preview='# Introduction'
+    )
+    assert system is prompts.MOSAIC_SYSTEM_PROMPT
+    assert context_block.startswith("## Current Task Context")
+    assert "750,000 characters" in context_block
+    assert "Strategy 2 (Chunk and aggregate)" in context_block
+    assert "# Introduction" in context_block
+    
+    # The combined prompt is the same two parts joined together
+    combined = prompts.get_system_prompt_with_context(
+        context_type='markdown',
+        context_length=750000,
+        context_preview='# Introduction'
+    )
+    assert combined == system + "\n\n" + context_block
+    log.info("✓ get_system_prompt_parts() keeps the system prompt static")
 
 
 def test_get_system_prompt_for_research():
@@ -62,7 +114,7 @@ def test_get_system_prompt_for_research():
     assert "thesis" in prompt
     assert "Research Phase" in prompt
     assert "Pattern D" in prompt
-    print("✓ Research prompt works correctly")
+    log.info("✓ Research prompt works correctly")
 
 
 def test_get_system_prompt_for_code():
@@ -73,7 +125,7 @@ def test_get_system_prompt_for_code():
     assert "Implement a binary search tree" in prompt
     assert "Pattern E" in prompt
     assert "Code Quality Standards" in prompt
-    print("✓ Code prompt works correctly")
+    log.info("✓ Code prompt works correctly")
 
 
 def test_get_system_prompt_for_analysis():
@@ -84,12 +136,177 @@ def test_get_system_prompt_for_analysis():
     assert "Research paper on machine learning" in prompt
     assert "Pattern B" in prompt
     assert "Analysis Phase" in prompt
-    print("✓ Analysis prompt works correctly")
+    log.info("✓ Analysis prompt works correctly")
+
+
+def test_build_prompt():
+    """Test the variant-driven builder behind the specialized prompts"""
+    prompt = prompts.build_prompt('code', task_description="Refactor the parser")
+    assert prompt == prompts.get_system_prompt_for_code("Refactor the parser")
+    assert "Pattern E" in prompt
+    
+    prompt = prompts.build_prompt('research', topic="Caching", document_type="report")
+    assert prompt == prompts.get_system_prompt_for_research("Caching", document_type="report")
+    
+    prompt = prompts.build_prompt('research', topic="Caching")
+    assert prompt == prompts.get_system_prompt_for_research("Caching")
+    
+    prompt = prompts.build_prompt('analysis', context_description=['logs', 'traces'])
+    assert "['logs', 'traces']" in prompt
+    
+    try:
+        prompts.build_prompt('poetry', topic="Caching")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Unknown variant should raise ValueError")
+    
+    try:
+        prompts.build_prompt('code')
+    except TypeError as exc:
+        assert 'task_description' in str(exc)
+    else:
+        raise AssertionError("Missing placeholder value should raise TypeError")
+    log.info("✓ build_prompt() builds specialized prompts")
+
+
+def test_get_cacheable_blocks():
+    """Test that the static prompt is a separate block with a cache breakpoint"""
+    blocks = prompts.get_cacheable_blocks()
+    assert len(blocks) == 1
+    assert blocks[0]["text"] is prompts.MOSAIC_SYSTEM_PROMPT
+    assert blocks[0]["cache_control"] == {"type": "ephemeral"}
+    
+    blocks = prompts.get_cacheable_blocks('analysis', context_description="Server logs")
+    assert len(blocks) == 2
+    assert blocks[0]["text"] is prompts.MOSAIC_SYSTEM_PROMPT
+    assert "cache_control" not in blocks[1]
+    assert blocks[1]["text"].startswith("## Current Analysis Task")
+    assert "Server logs" in blocks[1]["text"]
+    
+    try:
+        prompts.get_cacheable_blocks(topic="Caching")
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("Placeholder values without a variant should raise TypeError")
+    log.info("✓ get_cacheable_blocks() splits static and task-specific text")
+
+
+def test_prompt_builders_are_cached():
+    """Test that repeated calls with the same arguments reuse the built prompt"""
+    first = prompts.get_system_prompt_for_research("Caching", document_type="report")
+    second = prompts.get_system_prompt_for_research("Caching", document_type="report")
+    assert first is second
+    
+    assert prompts.get_system_prompt_for_code("Cache me") is prompts.get_system_prompt_for_code("Cache me")
+    assert prompts.get_system_prompt_for_analysis("Logs") is prompts.get_system_prompt_for_analysis("Logs")
+    log.info("✓ Prompt builders return cached results")
+
+
+def test_select_strategy():
+    """Test size-based strategy selection thresholds"""
+    assert prompts.select_strategy(0) == 1
+    assert prompts.select_strategy(499999) == 1
+    assert prompts.select_strategy(500000) == 2
+    assert prompts.select_strategy(1999999) == 2
+    assert prompts.select_strategy(2000000) == 3
+    assert prompts.select_strategy(5000000) == 3
+    log.info("✓ select_strategy() thresholds correct")
+
+
+def test_base_prompt_token_budget():
+    """Test the cached token count and context budget helpers"""
+    count = prompts.get_base_prompt_token_count()
+    assert isinstance(count, int)
+    assert 0 < count < len(prompts.MOSAIC_SYSTEM_PROMPT)
+    assert prompts.get_base_prompt_token_count() == count
+    
+    assert prompts.remaining_context_budget(count + 1000) == 1000
+    assert prompts.remaining_context_budget(count // 2) == 0
+    log.info("✓ Base prompt uses %d tokens", count)
+
+
+def test_token_helpers_fall_back_when_encoding_fails():
+    """Test that a tiktoken that cannot load its files falls back to the estimate"""
+    def get_encoding(name):
+        raise OSError("BPE file not reachable")
+    
+    offline_tiktoken = types.ModuleType('tiktoken')
+    offline_tiktoken.get_encoding = get_encoding
+    saved = sys.modules.get('tiktoken')
+    sys.modules['tiktoken'] = offline_tiktoken
+    prompts._get_encoding.cache_clear()
+    try:
+        assert prompts._get_encoding() is None
+        chunks = list(prompts.chunk_by_tokens("x" * 5000, target_tokens=300, overlap_tokens=0))
+        assert "".join(chunks) == "x" * 5000
+    finally:
+        if saved is None:
+            del sys.modules['tiktoken']
+        else:
+            sys.modules['tiktoken'] = saved
+        prompts._get_encoding.cache_clear()
+    log.info("✓ Token helpers fall back when the encoding cannot be loaded")
+
+
+def test_chunk_by_tokens():
+    """Test token-based chunking with and without overlap"""
+    text = "The quick brown fox jumps over the lazy dog. " * 500
+    
+    chunks = list(prompts.chunk_by_tokens(text, target_tokens=300, overlap_tokens=0))
+    assert len(chunks) > 1
+    assert "".join(chunks) == text
+    
+    overlapping = list(prompts.chunk_by_tokens(text, target_tokens=300, overlap_tokens=100))
+    assert len(overlapping) > len(chunks)
+    assert overlapping[0] == chunks[0]
+    
+    assert list(prompts.chunk_by_tokens("", target_tokens=300)) == []
+    
+    try:
+        prompts.chunk_by_tokens(text, target_tokens=100, overlap_tokens=100)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("overlap_tokens >= target_tokens should raise ValueError")
+    log.info("✓ chunk_by_tokens() split text into %d chunks", len(chunks))
+
+
+class _ByteEncoding:
+    """Stand-in tiktoken encoding with one token per UTF-8 byte"""
+    
+    def encode(self, text, disallowed_special="all"):
+        # Like tiktoken, reject special-token text unless it is allowed
+        if disallowed_special == "all" and "<|endoftext|>" in text:
+            raise ValueError("Encountered text corresponding to disallowed special token")
+        return list(text.encode('utf-8'))
+    
+    def decode_tokens_bytes(self, tokens):
+        return [bytes([token]) for token in tokens]
+
+
+def test_chunk_by_tokens_keeps_characters_whole():
+    """Test that token chunking keeps characters whole and accepts special-token text"""
+    text = "Mosaic — 日本語のテキスト 🎉 <|endoftext|> done. " * 40
+    get_encoding = prompts._get_encoding
+    prompts._get_encoding = _ByteEncoding
+    try:
+        for target_tokens in (1, 2, 5, 64):
+            chunks = list(prompts.chunk_by_tokens(text, target_tokens, overlap_tokens=0))
+            assert "".join(chunks) == text
+            assert all(chunks)
+        
+        overlapping = list(prompts.chunk_by_tokens(text, 64, overlap_tokens=16))
+        assert all(chunk in text for chunk in overlapping)
+    finally:
+        prompts._get_encoding = get_encoding
+    log.info("✓ chunk_by_tokens() keeps multi-byte characters whole")
 
 
 def test_prompt_contains_key_sections():
     """Test that the prompt contains all required sections"""
-    prompt = prompts.MOSAIC_SYSTEM_PROMPT
+    prompt = _PROMPT
     
     required_sections = [
         "Environment Capabilities",
@@ -121,15 +338,15 @@ def test_prompt_contains_key_sections():
         "Critical Rules",
     ]
     
-    for section in required_sections:
-        assert section in prompt, f"Missing required section: {section}"
+    missing = [section for section in required_sections if section not in prompt]
+    assert not missing, f"Missing required sections: {', '.join(missing)}"
     
-    print(f"✓ All {len(required_sections)} required sections present")
+    log.info("✓ All %d required sections present", len(required_sections))
 
 
 def test_prompt_contains_code_examples():
     """Test that the prompt contains working code examples"""
-    prompt = prompts.MOSAIC_SYSTEM_PROMPT
+    prompt = _PROMPT
     
     required_code_patterns = [
         "chunk_size = len(context) // 10",
@@ -141,10 +358,21 @@ def test_prompt_contains_code_examples():
         "llm_query_batched(",
     ]
     
-    for pattern in required_code_patterns:
-        assert pattern in prompt, f"Missing code pattern: {pattern}"
+    missing = [pattern for pattern in required_code_patterns if pattern not in prompt]
+    assert not missing, f"Missing code patterns: {', '.join(missing)}"
+    
+    log.info("✓ All %d code patterns present", len(required_code_patterns))
+
+
+def test_prompt_code_examples_compile():
+    """Test that every Python example in the prompt is valid syntax"""
+    blocks = re.findall(r"```python\n(.*?)```", _PROMPT, re.DOTALL)
+    assert len(blocks) >= 10
+    
+    for i, block in enumerate(blocks):
+        compile(block, f"<prompt example {i + 1}>", "exec")
     
-    print(f"✓ All {len(required_code_patterns)} code patterns present")
+    log.info("✓ All %d code examples compile", len(blocks))
 
 
 def test_module_exports():
@@ -152,28 +380,51 @@ def test_module_exports():
     expected_exports = [
         'MOSAIC_SYSTEM_PROMPT',
         'get_system_prompt',
+        'get_system_prompt_bytes',
+        'get_system_prompt_json',
         'get_system_prompt_with_context',
+        'get_system_prompt_parts',
+        'render_context_block',
         'get_system_prompt_for_research',
         'get_system_prompt_for_code',
         'get_system_prompt_for_analysis',
+        'build_prompt',
+        'get_cacheable_blocks',
+        'select_strategy',
+        'get_base_prompt_token_count',
+        'remaining_context_budget',
+        'chunk_by_tokens',
     ]
     
-    for export in expected_exports:
-        assert hasattr(prompts, export), f"Missing export: {export}"
+    missing = sorted(set(expected_exports).difference(vars(prompts)))
+    assert not missing, f"Missing exports: {', '.join(missing)}"
     
-    print(f"✓ All {len(expected_exports)} exports available")
+    log.info("✓ All %d exports available", len(expected_exports))
 
 
 if __name__ == '__main__':
+    logging.basicConfig(stream=sys.stdout, level=logging.INFO, format="%(message)s")
+    
     print("Running prompts.py tests...\n")
     
     test_get_system_prompt()
+    test_get_system_prompt_encoded_forms()
     test_get_system_prompt_with_context()
+    test_get_system_prompt_parts()
     test_get_system_prompt_for_research()
     test_get_system_prompt_for_code()
     test_get_system_prompt_for_analysis()
+    test_build_prompt()
+    test_get_cacheable_blocks()
+    test_prompt_builders_are_cached()
+    test_select_strategy()
+    test_base_prompt_token_budget()
+    test_token_helpers_fall_back_when_encoding_fails()
+    test_chunk_by_tokens()
+    test_chunk_by_tokens_keeps_characters_whole()
     test_prompt_contains_key_sections()
     test_prompt_contains_code_examples()
+    test_prompt_code_examples_compile()
     test_module_exports()
     
     print("\n✅ All tests passed!")
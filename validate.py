@@ -7,127 +7,170 @@ This script validates that all requirements from the problem statement are met.
 import prompts
 
 
+_BAR = "=" * 70
+_PROMPT = prompts.MOSAIC_SYSTEM_PROMPT
+
+# The prompt never changes, so its size statistics are counted once
+_PROMPT_LINES = _PROMPT.count('\n')
+_PROMPT_CODE_BLOCKS = _PROMPT.count('```python')
+
+# Environment capabilities the prompt must describe
+_CAPABILITIES = (
+    'Python REPL',
+    'Memory System',
+    'memory_search',
+    'memory_count',
+    'Recursive LLM Queries',
+    'llm_query',
+    'llm_query_batched',
+)
+
+# The 6 core principles
+_PRINCIPLES = (
+    'Execute, Don\'t Describe',
+    'Decompose Complex Tasks',
+    'Verify Progress',
+    'Use Variables as Buffers',
+    'Check Memory First',
+    'Think Step by Step',
+)
+
+# (strategy heading, description) for the 5 context processing strategies
+_STRATEGIES = (
+    ('Strategy 1: Small Context', '< 500K characters'),
+    ('Strategy 2: Medium Context', '500K - 2M characters'),
+    ('Strategy 3: Large Context', '> 2M characters'),
+    ('Strategy 4: Structured Content', 'Markdown, JSON'),
+    ('Strategy 5: Iterative Reading', 'Sequential'),
+)
+
+# (pattern heading, description) for the 6 task patterns
+_PATTERNS = (
+    ('Pattern A', 'Simple Questions'),
+    ('Pattern B', 'Document/Context Analysis'),
+    ('Pattern C', 'Multi-Step Tasks'),
+    ('Pattern D', 'Research & Writing'),
+    ('Pattern E', 'Code Analysis/Generation'),
+    ('Pattern F', 'Information Aggregation'),
+)
+
+# Special case headings
+_SPECIAL_CASES = (
+    'When context variable exists',
+    'When memory is relevant',
+    'When task is ambiguous',
+    'When errors occur',
+)
+
+# Critical rules reported when present
+_CRITICAL_RULES = (
+    'Don\'t just plan—execute',
+    'Show your work with print()',
+    'Handle errors gracefully',
+    'Be efficient with sub-LLMs',
+    'Verify before finishing',
+)
+
+# (description, snippet) for code the examples must contain
+_CODE_PATTERNS = (
+    ('Chunking strategy', 'chunk_size = len(context) // 10'),
+    ('Loop through chunks', 'for i in range(10):'),
+    ('Sub-LLM queries', 'llm_query('),
+    ('Memory search', 'memory_search('),
+    ('Print progress', 'print('),
+    ('Research pattern', 'research_questions'),
+    ('Document sections', 'section_names'),
+    ('Error handling', 'try:'),
+    ('Final output', 'FINAL('),
+)
+
+
 def validate_core_components():
     """Validate that all core components are present"""
-    print("=" * 70)
+    print(_BAR)
     print("VALIDATION 1: Core Components")
-    print("=" * 70)
+    print(_BAR)
     
-    prompt = prompts.MOSAIC_SYSTEM_PROMPT
+    prompt = _PROMPT
     
-    # Environment Capabilities
-    capabilities = [
-        'Python REPL',
-        'Memory System',
-        'memory_search',
-        'memory_count',
-        'Recursive LLM Queries',
-        'llm_query',
-        'llm_query_batched',
-    ]
+    missing = [cap for cap in _CAPABILITIES if cap not in prompt]
+    assert not missing, f"Missing: {', '.join(missing)}"
     
     print("\n✓ Environment Capabilities:")
-    for cap in capabilities:
-        assert cap in prompt, f"Missing: {cap}"
-        print(f"  ✓ {cap}")
-    
-    # Core Principles (all 6)
-    principles = [
-        'Execute, Don\'t Describe',
-        'Decompose Complex Tasks',
-        'Verify Progress',
-        'Use Variables as Buffers',
-        'Check Memory First',
-        'Think Step by Step',
-    ]
+    print("\n".join(f"  ✓ {cap}" for cap in _CAPABILITIES))
+    
+    missing = [principle for principle in _PRINCIPLES if principle not in prompt]
+    assert not missing, f"Missing: {', '.join(missing)}"
     
     print("\n✓ Core Principles (6):")
-    for principle in principles:
-        assert principle in prompt, f"Missing: {principle}"
-        print(f"  ✓ {principle}")
+    print("\n".join(f"  ✓ {principle}" for principle in _PRINCIPLES))
     
     print("\n✅ All core components present\n")
 
 
 def validate_context_strategies():
     """Validate all 5 context processing strategies"""
-    print("=" * 70)
+    print(_BAR)
     print("VALIDATION 2: Context Processing Strategies (5)")
-    print("=" * 70)
+    print(_BAR)
     
-    prompt = prompts.MOSAIC_SYSTEM_PROMPT
+    prompt = _PROMPT
     
-    strategies = [
-        ('Strategy 1: Small Context', '< 500K characters'),
-        ('Strategy 2: Medium Context', '500K - 2M characters'),
-        ('Strategy 3: Large Context', '> 2M characters'),
-        ('Strategy 4: Structured Content', 'Markdown, JSON'),
-        ('Strategy 5: Iterative Reading', 'Sequential'),
-    ]
+    missing = [name for name, _ in _STRATEGIES if name not in prompt]
+    assert not missing, f"Missing: {', '.join(missing)}"
     
     print()
-    for strategy_name, description in strategies:
-        assert strategy_name in prompt, f"Missing: {strategy_name}"
-        print(f"✓ {strategy_name} ({description})")
+    print("\n".join(
+        f"✓ {strategy_name} ({description})"
+        for strategy_name, description in _STRATEGIES
+    ))
     
     print("\n✅ All 5 strategies present\n")
 
 
 def validate_task_patterns():
     """Validate all 6 task patterns"""
-    print("=" * 70)
+    print(_BAR)
     print("VALIDATION 3: Task Patterns (6)")
-    print("=" * 70)
+    print(_BAR)
     
-    prompt = prompts.MOSAIC_SYSTEM_PROMPT
+    prompt = _PROMPT
     
-    patterns = [
-        ('Pattern A', 'Simple Questions'),
-        ('Pattern B', 'Document/Context Analysis'),
-        ('Pattern C', 'Multi-Step Tasks'),
-        ('Pattern D', 'Research & Writing'),
-        ('Pattern E', 'Code Analysis/Generation'),
-        ('Pattern F', 'Information Aggregation'),
-    ]
+    missing = [pattern_id for pattern_id, _ in _PATTERNS if pattern_id not in prompt]
+    assert not missing, f"Missing: {', '.join(missing)}"
     
     print()
-    for pattern_id, description in patterns:
-        assert pattern_id in prompt, f"Missing: {pattern_id}"
-        print(f"✓ {pattern_id}: {description}")
+    print("\n".join(
+        f"✓ {pattern_id}: {description}" for pattern_id, description in _PATTERNS
+    ))
     
     print("\n✅ All 6 patterns present\n")
 
 
 def validate_special_cases():
     """Validate special case handling"""
-    print("=" * 70)
+    print(_BAR)
     print("VALIDATION 4: Special Case Handling")
-    print("=" * 70)
+    print(_BAR)
     
-    prompt = prompts.MOSAIC_SYSTEM_PROMPT
+    prompt = _PROMPT
     
-    special_cases = [
-        'When context variable exists',
-        'When memory is relevant',
-        'When task is ambiguous',
-        'When errors occur',
-    ]
+    missing = [case for case in _SPECIAL_CASES if case not in prompt]
+    assert not missing, f"Missing: {', '.join(missing)}"
     
     print()
-    for case in special_cases:
-        assert case in prompt, f"Missing: {case}"
-        print(f"✓ {case}")
+    print("\n".join(f"✓ {case}" for case in _SPECIAL_CASES))
     
     print("\n✅ All special cases handled\n")
 
 
 def validate_output_formats():
     """Validate output format specifications"""
-    print("=" * 70)
+    print(_BAR)
     print("VALIDATION 5: Output Formats")
-    print("=" * 70)
+    print(_BAR)
     
-    prompt = prompts.MOSAIC_SYSTEM_PROMPT
+    prompt = _PROMPT
     
     print()
     assert 'FINAL(' in prompt, "Missing: FINAL() format"
@@ -141,64 +184,47 @@ def validate_output_formats():
 
 def validate_critical_rules():
     """Validate critical rules section"""
-    print("=" * 70)
+    print(_BAR)
     print("VALIDATION 6: Critical Rules")
-    print("=" * 70)
-    
-    prompt = prompts.MOSAIC_SYSTEM_PROMPT
+    print(_BAR)
     
-    rules = [
-        'Don\'t just plan—execute',
-        'Show your work with print()',
-        'Handle errors gracefully',
-        'Be efficient with sub-LLMs',
-        'Verify before finishing',
-    ]
+    prompt = _PROMPT
     
     print()
     assert 'Critical Rules' in prompt, "Missing: Critical Rules section"
     print("✓ Critical Rules section present")
     
-    for rule in rules:
-        if rule in prompt:
-            print(f"✓ {rule}")
+    present = [f"✓ {rule}" for rule in _CRITICAL_RULES if rule in prompt]
+    if present:
+        print("\n".join(present))
     
     print("\n✅ Critical rules documented\n")
 
 
 def validate_code_examples():
     """Validate that working code examples are included"""
-    print("=" * 70)
+    print(_BAR)
     print("VALIDATION 7: Code Examples")
-    print("=" * 70)
-    
-    prompt = prompts.MOSAIC_SYSTEM_PROMPT
-    
-    code_patterns = [
-        ('Chunking strategy', 'chunk_size = len(context) // 10'),
-        ('Loop through chunks', 'for i in range(10):'),
-        ('Sub-LLM queries', 'llm_query('),
-        ('Memory search', 'memory_search('),
-        ('Print progress', 'print('),
-        ('Research pattern', 'research_questions'),
-        ('Document sections', 'section_names'),
-        ('Error handling', 'try:'),
-        ('Final output', 'FINAL('),
-    ]
+    print(_BAR)
+    
+    prompt = _PROMPT
+    
+    missing = [pattern for _, pattern in _CODE_PATTERNS if pattern not in prompt]
+    assert not missing, f"Missing code patterns: {', '.join(missing)}"
     
     print()
-    for description, pattern in code_patterns:
-        assert pattern in prompt, f"Missing code pattern: {pattern}"
-        print(f"✓ {description}: {pattern}")
+    print("\n".join(
+        f"✓ {description}: {pattern}" for description, pattern in _CODE_PATTERNS
+    ))
     
     print("\n✅ All code examples present\n")
 
 
 def validate_helper_functions():
     """Validate that all helper functions exist and work"""
-    print("=" * 70)
+    print(_BAR)
     print("VALIDATION 8: Helper Functions")
-    print("=" * 70)
+    print(_BAR)
     
     print()
     
@@ -252,9 +278,9 @@ def validate_helper_functions():
 
 def validate_module_structure():
     """Validate module metadata and exports"""
-    print("=" * 70)
+    print(_BAR)
     print("VALIDATION 9: Module Structure")
-    print("=" * 70)
+    print(_BAR)
     
     print()
     
@@ -264,35 +290,35 @@ def validate_module_structure():
     
     # Check __all__ exports
     assert hasattr(prompts, '__all__')
-    assert len(prompts.__all__) == 6
+    assert len(prompts.__all__) == 16
     print(f"✓ Module exports: {len(prompts.__all__)} items")
     
     # Check all exports are accessible
-    for export_name in prompts.__all__:
-        assert hasattr(prompts, export_name), f"Missing export: {export_name}"
-        print(f"  ✓ {export_name}")
+    missing = sorted(set(prompts.__all__).difference(vars(prompts)))
+    assert not missing, f"Missing exports: {', '.join(missing)}"
+    print("\n".join(f"  ✓ {export_name}" for export_name in prompts.__all__))
     
     print("\n✅ Module structure correct\n")
 
 
 def validate_prompt_size():
     """Validate that the prompt is comprehensive"""
-    print("=" * 70)
+    print(_BAR)
     print("VALIDATION 10: Prompt Comprehensiveness")
-    print("=" * 70)
+    print(_BAR)
     
-    prompt = prompts.MOSAIC_SYSTEM_PROMPT
+    prompt = _PROMPT
     
     print()
     print(f"✓ Main prompt length: {len(prompt):,} characters")
-    print(f"✓ Main prompt lines: {prompt.count(chr(10)):,} lines")
+    print(f"✓ Main prompt lines: {_PROMPT_LINES:,} lines")
     
     # Check for substantial content
     assert len(prompt) > 15000, "Prompt seems too short"
     print(f"✓ Prompt exceeds minimum length (15K chars)")
     
     # Count code blocks
-    code_blocks = prompt.count('```python')
+    code_blocks = _PROMPT_CODE_BLOCKS
     print(f"✓ Python code examples: {code_blocks}")
     assert code_blocks >= 10, "Not enough code examples"
     
@@ -301,11 +327,14 @@ def validate_prompt_size():
 
 def main():
     """Run all validations"""
-    print("\n")
-    print("=" * 70)
-    print("COMPREHENSIVE VALIDATION OF PROMPTS.PY")
-    print("=" * 70)
-    print("\nValidating against problem statement requirements...\n")
+    print(f"""
+
+{_BAR}
+COMPREHENSIVE VALIDATION OF PROMPTS.PY
+{_BAR}
+
+Validating against problem statement requirements...
+""")
     
     try:
         validate_core_components()
@@ -319,19 +348,21 @@ def main():
         validate_module_structure()
         validate_prompt_size()
         
-        print("=" * 70)
-        print("✅ ALL VALIDATIONS PASSED")
-        print("=" * 70)
-        print("\nThe prompts.py file successfully meets all requirements:")
-        print("  ✓ Complete RLM paper instructions (Appendix D)")
-        print("  ✓ Mosaic memory system integration")
-        print("  ✓ Multi-step task execution patterns")
-        print("  ✓ Research/writing capabilities")
-        print("  ✓ All 5 context processing strategies")
-        print("  ✓ All 6 task patterns")
-        print("  ✓ All 5 helper functions")
-        print("  ✓ Comprehensive code examples")
-        print("\n")
+        print(f"""{_BAR}
+✅ ALL VALIDATIONS PASSED
+{_BAR}
+
+The prompts.py file successfully meets all requirements:
+  ✓ Complete RLM paper instructions (Appendix D)
+  ✓ Mosaic memory system integration
+  ✓ Multi-step task execution patterns
+  ✓ Research/writing capabilities
+  ✓ All 5 context processing strategies
+  ✓ All 6 task patterns
+  ✓ All 5 helper functions
+  ✓ Comprehensive code examples
+
+""")
         
         return True
         